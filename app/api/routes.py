@@ -1,17 +1,21 @@
+import asyncio
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
-import asyncio
 
-from app.db.base import get_db, async_session
+from app.db.base import get_db
 from app.models.models import Perfume, PerfumePatch
-from app.services.parser import run_perfumes_generator_once
+from app.services.scheduler import CRAWL_MODES
+from app.services.changelog import log_change, entry_to_event, changes_since
+from app.tasks.jobs import job_manager, PLAN_WAIT_SECONDS
+from app.config import CRAWL_MODE, CHANGELOG_PAGE_SIZE
 from app.ws.manager import manager
 from app.nats.client import nats_client
 from app.utils.utils import parse_price_to_float, perfume_to_dict_obj
+from app.utils.serialization import FastJSONResponse
 
 
 router = APIRouter()
@@ -20,16 +24,23 @@ router = APIRouter()
 @router.get("/perfumes", response_model=List[Perfume])
 async def list_perfumes(session: AsyncSession = Depends(get_db), brand: Optional[str] = None, only_discounted: bool =
                         Query(False, description="Если true - вернуть только парфюмы со скидкой, иначе - все")):
+    columns = (Perfume.id, Perfume.title, Perfume.brand, Perfume.actual_price, Perfume.old_price, Perfume.url)
     if only_discounted:
-        q = select(Perfume).where(Perfume.old_price != "").order_by(Perfume.id)
+        q = select(*columns).where(Perfume.old_price != "").order_by(Perfume.id)
     else:
-        q = select(Perfume).order_by(Perfume.id)
+        q = select(*columns).order_by(Perfume.id)
 
     if brand:
         q = q.where(func.lower(Perfume.brand) == brand.lower())
 
     result = await session.execute(q)
-    return result.scalars().all()
+    return FastJSONResponse([dict(row) for row in result.mappings()])
+
+
+@router.get("/perfumes/changes")
+async def list_changes(session: AsyncSession = Depends(get_db), since: int = Query(0, ge=0),
+                       limit: int = Query(CHANGELOG_PAGE_SIZE, ge=1, le=CHANGELOG_PAGE_SIZE)):
+    return await changes_since(session, since, limit)
 
 
 @router.get("/perfumes/{perfume_id}", response_model=Perfume)
@@ -45,10 +56,12 @@ async def create_perfume(perfume_in: Perfume, session: AsyncSession = Depends(ge
     perfume = Perfume(title=perfume_in.title, brand=perfume_in.brand, actual_price=perfume_in.actual_price,
                       old_price=perfume_in.old_price, url=perfume_in.url)
     session.add(perfume)
+    await session.flush()
+    entry = log_change(session, "perfume_created", perfume_to_dict_obj(perfume), "api")
     await session.commit()
     await session.refresh(perfume)
 
-    data = {"event": "perfume_created", "perfume": Perfume.model_validate(perfume).model_dump(), "source": "api"}
+    data = entry_to_event(entry)
     await manager.broadcast(data)
     try:
         await nats_client.publish("perfumes.updates", data)
@@ -76,38 +89,41 @@ async def patch_perfume(perfume_id: int, patch: PerfumePatch, session: AsyncSess
     if patch.url is not None:
         perfume.url = patch.url
 
+    price_event = None
+    new_actual_raw = perfume.actual_price
+    if new_actual_raw != old_actual_raw:
+        old_num = parse_price_to_float(old_actual_raw)
+        new_num = parse_price_to_float(new_actual_raw)
+        if old_num is not None and new_num is not None:
+            if new_num > old_num:
+                price_event = "price_up"
+            elif new_num < old_num:
+                price_event = "price_down"
+
     session.add(perfume)
+    await session.flush()
+    entry = log_change(session, "perfume_updated", perfume_to_dict_obj(perfume), "api")
+    price_entry = log_change(session, price_event, perfume_to_dict_obj(perfume), "api") if price_event else None
     await session.commit()
     await session.refresh(perfume)
 
-    data = {"event": "perfume_updated", "perfume": Perfume.model_validate(perfume).model_dump(), "source": "api"}
+    data = entry_to_event(entry)
     await manager.broadcast(data)
     try:
         await nats_client.publish("perfumes.updates", data)
     except Exception:
         pass
 
-    new_actual_raw = perfume.actual_price
-    if new_actual_raw != old_actual_raw:
-        old_num = parse_price_to_float(old_actual_raw)
-        new_num = parse_price_to_float(new_actual_raw)
-        if old_num is not None and new_num is not None:
-            if new_num > old_num:
-                price_event = "price_up"
-            elif new_num < old_num:
-                price_event = "price_down"
-            else:
-                price_event = None
-            if price_event:
-                price_data = {"event": price_event, "perfume": perfume_to_dict_obj(perfume), "source": "api"}
-                try:
-                    await manager.broadcast(price_data)
-                except Exception:
-                    pass
-                try:
-                    await nats_client.publish("perfumes.updates", price_data)
-                except Exception:
-                    pass
+    if price_entry:
+        price_data = entry_to_event(price_entry)
+        try:
+            await manager.broadcast(price_data)
+        except Exception:
+            pass
+        try:
+            await nats_client.publish("perfumes.updates", price_data)
+        except Exception:
+            pass
 
     return perfume
 
@@ -118,9 +134,10 @@ async def delete_perfume(perfume_id: int, session: AsyncSession = Depends(get_db
     if not perfume:
         raise HTTPException(status_code=404, detail="Perfume not found")
     await session.delete(perfume)
+    entry = log_change(session, "perfume_deleted", perfume_to_dict_obj(perfume), "api")
     await session.commit()
 
-    data = {"event": "perfume_deleted", "perfume": Perfume.model_validate(perfume).model_dump(), "source": "api"}
+    data = entry_to_event(entry)
     await manager.broadcast(data)
     try:
         await nats_client.publish("perfumes.updates", data)
@@ -136,11 +153,40 @@ async def list_brands(session: AsyncSession = Depends(get_db)):
     return brands
 
 
-@router.post("/tasks/run")
-async def run_generator_background():
-    async def _run():
-        async with async_session() as session:
-            await run_perfumes_generator_once(session)
+@router.post("/tasks/run", status_code=202)
+async def run_generator_background(mode: str = Query(CRAWL_MODE, description="incremental или sweep")):
+    if mode not in CRAWL_MODES:
+        raise HTTPException(status_code=400, detail="Unknown crawl mode")
+    job, created = job_manager.submit(mode)
+    if created:
+        await job.wait_planned(PLAN_WAIT_SECONDS)
+    if job.status == "skipped":
+        message = f"Фоновая задача пропущена: {job.detail}"
+    else:
+        message = "Фоновая задача запущена" if created else "Фоновая задача уже выполняется"
+    return {"message": message, "job": job.to_dict()}
+
+
+@router.get("/tasks")
+async def list_tasks():
+    return [job.to_dict() for job in job_manager.list()]
+
+
+@router.get("/tasks/{job_id}")
+async def get_task(job_id: str):
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return job.to_dict()
+
 
-    asyncio.create_task(_run())
-    return {"message": "Фоновая задача запущена"}
+@router.delete("/tasks/{job_id}")
+async def cancel_task(job_id: str):
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if not job.active:
+        raise HTTPException(status_code=409, detail="Task already finished")
+    job_manager.cancel(job_id)
+    await asyncio.wait({job.task}, timeout=5)
+    return job.to_dict()
@@ -1,7 +1,19 @@
-DATABASE_URL = "sqlite+aiosqlite:///./perfumes.db"
-BASE_URL = "https://www.letu.ru/browse/muzhchinam/muzhskaya-parfyumeriya"
-PARSE_LIMIT = 10
-MAX_PAGES = 100
-BACKGROUND_INTERVAL_SECONDS = 600
-NATS_SERVERS = ["nats://127.0.0.1:4222"]
-NATS_SUBJECT = "perfumes.updates"
\ No newline at end of file
+import os
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./perfumes.db")
+BASE_URL = os.getenv("BASE_URL", "https://www.letu.ru/browse/muzhchinam/muzhskaya-parfyumeriya")
+MAX_PAGES = int(os.getenv("MAX_PAGES", "100"))
+BACKGROUND_ENABLED = os.getenv("BACKGROUND_ENABLED", "true").lower() in ("1", "true", "yes")
+BACKGROUND_INTERVAL_SECONDS = int(os.getenv("BACKGROUND_INTERVAL_SECONDS", "600"))
+CRAWL_MODE = os.getenv("CRAWL_MODE", "incremental")
+CRAWL_BUDGET_PAGES = int(os.getenv("CRAWL_BUDGET_PAGES", "5"))
+CRAWL_MIN_INTERVAL_SECONDS = int(os.getenv("CRAWL_MIN_INTERVAL_SECONDS", "600"))
+CRAWL_MAX_INTERVAL_SECONDS = int(os.getenv("CRAWL_MAX_INTERVAL_SECONDS", "86400"))
+CRAWLER_PROCESS = os.getenv("CRAWLER_PROCESS", "false").lower() in ("1", "true", "yes")
+CRAWLER_PAGE_TIMEOUT_SECONDS = int(os.getenv("CRAWLER_PAGE_TIMEOUT_SECONDS", "120"))
+JOB_HISTORY_LIMIT = int(os.getenv("JOB_HISTORY_LIMIT", "50"))
+CHANGELOG_RETENTION_SECONDS = int(os.getenv("CHANGELOG_RETENTION_SECONDS", "604800"))
+CHANGELOG_PAGE_SIZE = int(os.getenv("CHANGELOG_PAGE_SIZE", "1000"))
+JSON_CODEC = os.getenv("JSON_CODEC", "orjson")
+NATS_SERVERS = os.getenv("NATS_SERVERS", "nats://127.0.0.1:4222").split(",")
+NATS_SUBJECT = os.getenv("NATS_SUBJECT", "perfumes.updates")
@@ -3,12 +3,16 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routes import router as api_router
 from app.tasks.fetcher import start_background, stop_background
-from app.db.base import init_db
+from app.db.base import init_db, async_session
 from app.ws.manager import manager
 from app.nats.client import nats_client
+from app.workers.crawler import crawler_worker
+from app.config import CRAWLER_PROCESS, BACKGROUND_ENABLED
+from app.utils.serialization import FastJSONResponse, MSGPACK_AVAILABLE
+from app.services.changelog import changes_since
 
 
-app = FastAPI(title="Perfumes API", version="1.0")
+app = FastAPI(title="Perfumes API", version="1.0", default_response_class=FastJSONResponse)
 
 app.include_router(api_router)
 
@@ -20,13 +24,41 @@ app.add_middleware(
 )
 
 
+async def replay_changes(websocket: WebSocket, since: int):
+    last_seq = since
+    async with async_session() as session:
+        while True:
+            page = await changes_since(session, last_seq)
+            last_seq = page["last_seq"]
+            if page["reset"]:
+                await manager.send(websocket, {"event": "resync_required", "last_seq": last_seq})
+                break
+            for event in page["events"]:
+                await manager.send(websocket, event)
+            if not page["has_more"]:
+                break
+    await manager.send(websocket, {"event": "replay_complete", "last_seq": last_seq})
+    await manager.finish_replay(websocket, last_seq)
+
+
 @app.websocket("/ws/perfumes")
 async def ws_perfumes(websocket: WebSocket):
-    await manager.connect(websocket)
+    subprotocol = "msgpack" if MSGPACK_AVAILABLE and "msgpack" in websocket.scope.get("subprotocols", []) else None
+    fmt = "msgpack" if subprotocol or websocket.query_params.get("format") == "msgpack" else "json"
+    resume_from = websocket.query_params.get("resume_from")
+    resume_from = int(resume_from) if resume_from and resume_from.isdigit() else None
+    await manager.connect(websocket, fmt, subprotocol, resume=resume_from is not None)
     try:
+        if resume_from is not None:
+            await replay_changes(websocket, resume_from)
         while True:
-            data = await websocket.receive_text()
-            await websocket.send_text(data)
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("text") is not None:
+                await websocket.send_text(message["text"])
+            elif message.get("bytes") is not None:
+                await websocket.send_bytes(message["bytes"])
     except WebSocketDisconnect:
         pass
     finally:
@@ -40,12 +72,16 @@ async def on_startup():
         await nats_client.connect()
     except Exception:
         pass
-    await start_background()
+    if CRAWLER_PROCESS:
+        crawler_worker.start()
+    if BACKGROUND_ENABLED:
+        await start_background()
 
 
 @app.on_event("shutdown")
 async def on_shutdown():
     await stop_background()
+    await crawler_worker.stop()
     try:
         await nats_client.close()
     except Exception:
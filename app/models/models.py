@@ -1,3 +1,4 @@
+import time
 from typing import Optional
 from pydantic import ConfigDict
 from sqlmodel import SQLModel, Field
@@ -8,6 +9,23 @@ class ParserState(SQLModel, table=True):
     value: int = Field(default=0)
 
 
+class PageSchedule(SQLModel, table=True):
+    page: int = Field(primary_key=True)
+    fingerprint: str = Field(default="")
+    change_rate: float = Field(default=0.5)
+    interval_seconds: int = Field(default=0)
+    next_visit_at: float = Field(default=0, index=True)
+    last_visited_at: Optional[float] = None
+    visits: int = Field(default=0)
+    changes: int = Field(default=0)
+
+
+class CrawlVisit(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    page: int
+    visited_at: float = Field(index=True)
+
+
 class Perfume(SQLModel, table=True):
     model_config = ConfigDict(from_attributes=True)
 
@@ -18,6 +36,18 @@ class Perfume(SQLModel, table=True):
     old_price: str
     url: str
 
+
+class ChangeLog(SQLModel, table=True):
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq: Optional[int] = Field(default=None, primary_key=True)
+    event: str
+    perfume_id: Optional[int] = Field(default=None, index=True)
+    payload: str
+    source: str
+    created_at: float = Field(default_factory=time.time, index=True)
+
+
 class PerfumePatch(SQLModel):
     title: Optional[str] = None
     brand: Optional[str] = None
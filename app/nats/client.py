@@ -1,4 +1,3 @@
-import json
 from typing import Optional
 
 from nats.aio.client import Client as NATS
@@ -9,6 +8,8 @@ from app.models.models import Perfume
 from app.ws.manager import manager
 from sqlmodel import select
 from app.utils.utils import parse_price_to_float, perfume_to_dict_obj
+from app.utils.serialization import dumps, loads
+from app.services.changelog import log_change, entry_to_event
 
 
 class NATSClient:
@@ -26,15 +27,17 @@ class NATSClient:
         if not self._nc or not getattr(self._nc, "is_connected", False):
             return
         try:
-            await self._nc.publish(subject, json.dumps(data).encode())
+            await self._nc.publish(subject, dumps(data))
         except Exception:
             pass
 
     async def _on_message(self, msg):
         try:
-            data = json.loads(msg.data.decode())
+            data = loads(msg.data)
         except Exception:
             return
+        if not isinstance(data, dict):
+            return
 
         source = (data.get("source") or "").lower()
         if source in ("api", "parser", "nats_server"):
@@ -52,6 +55,7 @@ class NATSClient:
         if not url:
             return
 
+        entries = []
         try:
             async with async_session() as session:
                 async with session.begin():
@@ -90,34 +94,11 @@ class NATSClient:
                             await session.flush()
                             await session.refresh(existing)
 
-                            payload = {
-                                "event": "perfume_updated",
-                                "perfume": perfume_to_dict_obj(existing),
-                                "source": "nats_server",
-                            }
-                            try:
-                                await manager.broadcast(payload)
-                            except Exception:
-                                pass
-                            try:
-                                await self.publish(NATS_SUBJECT, payload)
-                            except Exception:
-                                pass
-
+                            entries.append(log_change(session, "perfume_updated", perfume_to_dict_obj(existing),
+                                                      "nats_server"))
                             if price_event:
-                                ppayload = {
-                                    "event": price_event,
-                                    "perfume": perfume_to_dict_obj(existing),
-                                    "source": "nats_server",
-                                }
-                                try:
-                                    await manager.broadcast(ppayload)
-                                except Exception:
-                                    pass
-                                try:
-                                    await self.publish(NATS_SUBJECT, ppayload)
-                                except Exception:
-                                    pass
+                                entries.append(log_change(session, price_event, perfume_to_dict_obj(existing),
+                                                          "nats_server"))
 
                     else:
                         new = Perfume(
@@ -131,22 +112,22 @@ class NATSClient:
                         await session.flush()
                         await session.refresh(new)
 
-                        payload = {
-                            "event": "perfume_created",
-                            "perfume": perfume_to_dict_obj(new),
-                            "source": "nats_server",
-                        }
-                        try:
-                            await manager.broadcast(payload)
-                        except Exception:
-                            pass
-                        try:
-                            await self.publish(NATS_SUBJECT, payload)
-                        except Exception:
-                            pass
+                        entries.append(log_change(session, "perfume_created", perfume_to_dict_obj(new), "nats_server"))
 
         except Exception as e:
             print("Error in NATS _on_message:", e)
+            return
+
+        for entry in entries:
+            payload = entry_to_event(entry)
+            try:
+                await manager.broadcast(payload)
+            except Exception:
+                pass
+            try:
+                await self.publish(NATS_SUBJECT, payload)
+            except Exception:
+                pass
 
     async def close(self):
         if self._nc and getattr(self._nc, "is_connected", False):
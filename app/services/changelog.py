@@ -0,0 +1,64 @@
+import time
+from typing import Optional
+
+from sqlalchemy import delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models.models import ChangeLog, ParserState
+from app.config import CHANGELOG_RETENTION_SECONDS, CHANGELOG_PAGE_SIZE
+from app.utils.serialization import dumps, loads
+
+
+COMPACTED_SEQ_KEY = "changelog_compacted_seq"
+
+
+def log_change(session: AsyncSession, event: str, perfume: dict, source: str):
+    entry = ChangeLog(event=event, perfume_id=perfume.get("id"), payload=dumps(perfume).decode(), source=source)
+    session.add(entry)
+    return entry
+
+
+def entry_to_event(entry: ChangeLog):
+    return {"seq": entry.seq, "event": entry.event, "perfume": loads(entry.payload), "source": entry.source}
+
+
+async def compacted_seq(session: AsyncSession):
+    state = await session.get(ParserState, COMPACTED_SEQ_KEY)
+    return state.value if state else 0
+
+
+async def changes_since(session: AsyncSession, since: int, limit: int = CHANGELOG_PAGE_SIZE):
+    floor = await compacted_seq(session)
+    if since < floor:
+        result = await session.execute(select(func.max(ChangeLog.seq)))
+        return {"events": [], "last_seq": max(floor, result.scalar() or 0), "has_more": False, "reset": True}
+
+    result = await session.execute(
+        select(ChangeLog).where(ChangeLog.seq > since).order_by(ChangeLog.seq).limit(limit + 1)
+    )
+    entries = result.scalars().all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    last_seq = entries[-1].seq if entries else max(since, floor)
+    return {"events": [entry_to_event(e) for e in entries], "last_seq": last_seq, "has_more": has_more,
+            "reset": False}
+
+
+async def compact_changes(session: AsyncSession, retention_seconds: int = CHANGELOG_RETENTION_SECONDS,
+                          now: Optional[float] = None):
+    now = time.time() if now is None else now
+    cutoff = now - retention_seconds
+    result = await session.execute(select(func.max(ChangeLog.seq)).where(ChangeLog.created_at < cutoff))
+    max_expired = result.scalar()
+    if max_expired is None:
+        return 0
+
+    result = await session.execute(delete(ChangeLog).where(ChangeLog.seq <= max_expired))
+    state = await session.get(ParserState, COMPACTED_SEQ_KEY)
+    if state is None:
+        state = ParserState(key=COMPACTED_SEQ_KEY, value=0)
+    state.value = max(state.value, max_expired)
+    session.add(state)
+    await session.commit()
+    return result.rowcount
@@ -0,0 +1,155 @@
+import hashlib
+import time
+from typing import List, Optional
+
+from sqlalchemy import delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models.models import CrawlVisit, PageSchedule, ParserState, Perfume
+from app.config import (MAX_PAGES, BACKGROUND_INTERVAL_SECONDS, CRAWL_BUDGET_PAGES, CRAWL_MIN_INTERVAL_SECONDS,
+                        CRAWL_MAX_INTERVAL_SECONDS)
+
+
+CHANGE_RATE_ALPHA = 0.3
+CRAWL_MODES = ("incremental", "sweep")
+SWEEP_CURSOR_KEY = "sweep_page"
+
+
+class CrawlSkipped(Exception):
+    pass
+
+
+def page_fingerprint(products: List[Perfume]):
+    rows = sorted((p.url or "", p.title or "", p.brand or "", p.actual_price or "", p.old_price or "")
+                  for p in products)
+    return hashlib.sha1(repr(rows).encode()).hexdigest()
+
+
+def interval_for_rate(change_rate: float):
+    if change_rate <= 0:
+        return CRAWL_MAX_INTERVAL_SECONDS
+    interval = CRAWL_MIN_INTERVAL_SECONDS / change_rate
+    return int(min(CRAWL_MAX_INTERVAL_SECONDS, max(CRAWL_MIN_INTERVAL_SECONDS, interval)))
+
+
+async def ensure_schedule(session: AsyncSession):
+    result = await session.execute(select(PageSchedule.page))
+    known = set(result.scalars().all())
+    missing = [p for p in range(1, MAX_PAGES + 1) if p not in known]
+    for page in missing:
+        session.add(PageSchedule(page=page, interval_seconds=CRAWL_MIN_INTERVAL_SECONDS))
+    if missing:
+        await session.commit()
+
+
+async def budget_remaining(session: AsyncSession, now: Optional[float] = None):
+    now = time.time() if now is None else now
+    result = await session.execute(
+        select(func.count()).select_from(CrawlVisit)
+        .where(CrawlVisit.visited_at >= now - BACKGROUND_INTERVAL_SECONDS)
+    )
+    return max(0, CRAWL_BUDGET_PAGES - (result.scalar() or 0))
+
+
+async def due_pages(session: AsyncSession, limit: int = CRAWL_BUDGET_PAGES, now: Optional[float] = None):
+    now = time.time() if now is None else now
+    await ensure_schedule(session)
+    result = await session.execute(
+        select(PageSchedule.page)
+        .where(PageSchedule.page <= MAX_PAGES, PageSchedule.next_visit_at <= now)
+        .order_by(PageSchedule.next_visit_at, PageSchedule.change_rate.desc())
+        .limit(limit)
+    )
+    return list(result.scalars().all())
+
+
+async def sweep_pages(session: AsyncSession, limit: int = CRAWL_BUDGET_PAGES):
+    cursor = await session.get(ParserState, SWEEP_CURSOR_KEY)
+    start = cursor.value if cursor and 1 <= cursor.value <= MAX_PAGES else 1
+    count = min(limit, MAX_PAGES)
+    pages = [(start - 1 + i) % MAX_PAGES + 1 for i in range(count)]
+    await ensure_schedule(session)
+    return pages
+
+
+async def advance_sweep(session: AsyncSession, page: int):
+    cursor = await session.get(ParserState, SWEEP_CURSOR_KEY)
+    if cursor is None:
+        cursor = ParserState(key=SWEEP_CURSOR_KEY, value=1)
+    cursor.value = page % MAX_PAGES + 1
+    session.add(cursor)
+
+
+async def select_pages(session: AsyncSession, mode: str, limit: int = CRAWL_BUDGET_PAGES):
+    if mode not in CRAWL_MODES:
+        raise ValueError(f"Unknown crawl mode: {mode}")
+    limit = min(limit, await budget_remaining(session))
+    if limit <= 0:
+        raise CrawlSkipped("crawl budget exhausted")
+    if mode == "sweep":
+        pages = await sweep_pages(session, limit)
+    else:
+        pages = await due_pages(session, limit)
+    if not pages:
+        raise CrawlSkipped("no pages due")
+    return pages
+
+
+async def record_visit(session: AsyncSession, page: int, products: Optional[List[Perfume]],
+                       now: Optional[float] = None):
+    now = time.time() if now is None else now
+    state = await session.get(PageSchedule, page)
+    if state is None:
+        state = PageSchedule(page=page, interval_seconds=CRAWL_MIN_INTERVAL_SECONDS)
+
+    state.last_visited_at = now
+    session.add(CrawlVisit(page=page, visited_at=now))
+    await session.execute(delete(CrawlVisit).where(CrawlVisit.visited_at < now - BACKGROUND_INTERVAL_SECONDS))
+    if products is None:
+        state.interval_seconds = max(state.interval_seconds, CRAWL_MIN_INTERVAL_SECONDS)
+        state.next_visit_at = now + state.interval_seconds
+        session.add(state)
+        await session.commit()
+        return False
+
+    fingerprint = page_fingerprint(products) if products else ""
+    changed = state.visits > 0 and fingerprint != state.fingerprint
+    if state.visits > 0:
+        state.change_rate = CHANGE_RATE_ALPHA * (1.0 if changed else 0.0) + (1 - CHANGE_RATE_ALPHA) * state.change_rate
+    if changed:
+        state.changes += 1
+    state.visits += 1
+    state.fingerprint = fingerprint
+    state.interval_seconds = interval_for_rate(state.change_rate)
+    state.next_visit_at = now + state.interval_seconds
+    session.add(state)
+    await session.commit()
+    return changed
+
+
+async def seconds_until_next_visit(session: AsyncSession, now: Optional[float] = None):
+    now = time.time() if now is None else now
+    result = await session.execute(
+        select(PageSchedule.next_visit_at)
+        .where(PageSchedule.page <= MAX_PAGES)
+        .order_by(PageSchedule.next_visit_at)
+        .limit(1)
+    )
+    next_at = result.scalars().first()
+    if next_at is None:
+        return 0.0
+    wait = max(0.0, next_at - now)
+
+    if await budget_remaining(session, now) > 0:
+        return wait
+    result = await session.execute(
+        select(CrawlVisit.visited_at)
+        .where(CrawlVisit.visited_at >= now - BACKGROUND_INTERVAL_SECONDS)
+        .order_by(CrawlVisit.visited_at)
+        .limit(1)
+    )
+    oldest = result.scalars().first()
+    if oldest is None:
+        return wait
+    return max(wait, oldest + BACKGROUND_INTERVAL_SECONDS - now)
@@ -2,23 +2,37 @@ import asyncio
 from typing import Optional
 
 from app.db.base import async_session
-from app.services.parser import run_perfumes_generator_once
-from app.config import BACKGROUND_INTERVAL_SECONDS
+from app.tasks.jobs import job_manager
+from app.services.scheduler import seconds_until_next_visit
+from app.services.changelog import compact_changes
+from app.config import BACKGROUND_INTERVAL_SECONDS, CRAWL_MODE
 
 
 _shutdown_event: asyncio.Event = asyncio.Event()
 _background_task_handle: Optional[asyncio.Task] = None
 
 
-async def background_loop(interval_seconds: int = BACKGROUND_INTERVAL_SECONDS):
+MIN_SLEEP_SECONDS = 1
+
+
+async def background_loop(interval_seconds: int = BACKGROUND_INTERVAL_SECONDS, mode: str = CRAWL_MODE):
     while not _shutdown_event.is_set():
+        timeout = interval_seconds
+        job, _ = job_manager.submit(mode)
+        await job.wait()
         async with async_session() as session:
             try:
-                await run_perfumes_generator_once(session)
+                await compact_changes(session)
             except Exception:
                 pass
+            if mode == "incremental" and job.status in ("done", "skipped"):
+                try:
+                    until_due = await seconds_until_next_visit(session)
+                    timeout = max(MIN_SLEEP_SECONDS, min(interval_seconds, until_due))
+                except Exception:
+                    pass
         try:
-            await asyncio.wait_for(_shutdown_event.wait(), timeout=interval_seconds)
+            await asyncio.wait_for(_shutdown_event.wait(), timeout=timeout)
         except asyncio.TimeoutError:
             continue
 
@@ -31,6 +45,7 @@ async def start_background():
 
 async def stop_background():
     _shutdown_event.set()
+    await job_manager.shutdown()
     global _background_task_handle
     if _background_task_handle is not None:
         try:
@@ -0,0 +1,137 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+from app.db.base import async_session
+from app.services.parser import parse_lock, run_perfumes_generator_once
+from app.services.scheduler import CrawlSkipped
+from app.config import CRAWL_MODE, JOB_HISTORY_LIMIT
+
+
+ACTIVE_STATUSES = ("pending", "running")
+PLAN_WAIT_SECONDS = 1
+
+
+class Job:
+    def __init__(self, mode: str):
+        self.id = uuid.uuid4().hex
+        self.mode = mode
+        self.status = "pending"
+        self.pages_total = 0
+        self.pages_done = 0
+        self.items_changed = 0
+        self.triggers = 1
+        self.error: Optional[str] = None
+        self.detail: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self._planned = asyncio.Event()
+
+    @property
+    def active(self):
+        return self.status in ACTIVE_STATUSES
+
+    def update_progress(self, pages_total: int, pages_done: int, items_changed: int):
+        self.pages_total = pages_total
+        self.pages_done = pages_done
+        self.items_changed = items_changed
+        self._planned.set()
+
+    async def wait(self):
+        if self.task is not None:
+            await asyncio.shield(self.task)
+
+    async def wait_planned(self, timeout: float):
+        try:
+            await asyncio.wait_for(self._planned.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "mode": self.mode,
+            "status": self.status,
+            "pages_total": self.pages_total,
+            "pages_done": self.pages_done,
+            "items_changed": self.items_changed,
+            "triggers": self.triggers,
+            "error": self.error,
+            "detail": self.detail,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    def __init__(self, history_limit: int = JOB_HISTORY_LIMIT):
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._history_limit = history_limit
+
+    def submit(self, mode: str = CRAWL_MODE):
+        for job in reversed(self._jobs.values()):
+            if job.mode == mode and job.active:
+                job.triggers += 1
+                return job, False
+
+        job = Job(mode)
+        job.task = asyncio.create_task(self._run(job))
+        self._jobs[job.id] = job
+        self._prune()
+        return job, True
+
+    def get(self, job_id: str):
+        return self._jobs.get(job_id)
+
+    def list(self):
+        return list(reversed(self._jobs.values()))
+
+    def cancel(self, job_id: str):
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        if job.active and job.task is not None:
+            job.task.cancel()
+        return job
+
+    async def shutdown(self):
+        tasks = [job.task for job in self._jobs.values() if job.active and job.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, job: Job):
+        try:
+            async with parse_lock:
+                job.status = "running"
+                job.started_at = time.time()
+                async with async_session() as session:
+                    await run_perfumes_generator_once(session, job.mode, progress=job.update_progress)
+            job.status = "done"
+        except CrawlSkipped as e:
+            job.status = "skipped"
+            job.detail = str(e)
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+        except Exception as e:
+            job.status = "failed"
+            job.error = f"{type(e).__name__}: {e}"
+            print(f"Error in job {job.id}:", e)
+        finally:
+            job.finished_at = time.time()
+            job._planned.set()
+
+    def _prune(self):
+        while len(self._jobs) > self._history_limit:
+            oldest_id = next((jid for jid, j in self._jobs.items() if not j.active), None)
+            if oldest_id is None:
+                break
+            del self._jobs[oldest_id]
+
+
+job_manager = JobManager()
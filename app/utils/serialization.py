@@ -0,0 +1,43 @@
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from app.config import JSON_CODEC
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+USE_ORJSON = JSON_CODEC == "orjson" and orjson is not None
+MSGPACK_AVAILABLE = msgpack is not None
+
+
+def dumps(obj: Any):
+    if USE_ORJSON:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def loads(data):
+    if USE_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def msgpack_dumps(obj: Any):
+    if msgpack is None:
+        raise RuntimeError("msgpack is not installed")
+    return msgpack.packb(obj, use_bin_type=True)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any):
+        return dumps(content)
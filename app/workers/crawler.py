@@ -0,0 +1,155 @@
+import asyncio
+import itertools
+import multiprocessing as mp
+import threading
+from typing import List, Optional
+
+from app.models.models import Perfume
+from app.config import CRAWLER_PAGE_TIMEOUT_SECONDS
+from app.utils.utils import perfume_to_dict_obj
+
+
+POLL_SECONDS = 5
+
+
+def _worker_main(requests: mp.Queue, results: mp.Queue, cancelled):
+    asyncio.run(_serve(requests, results, cancelled))
+
+
+async def _serve(requests: mp.Queue, results: mp.Queue, cancelled):
+    from app.services.parser import LetuParser, fetch_page
+
+    loop = asyncio.get_running_loop()
+    while True:
+        request = await loop.run_in_executor(None, requests.get)
+        if request is None:
+            break
+
+        request_id = request["id"]
+        if cancelled.value == request_id:
+            continue
+        parser = LetuParser()
+        try:
+            await parser.start()
+            for page_num in request["pages"]:
+                if cancelled.value == request_id:
+                    break
+                products = await fetch_page(parser, page_num)
+                results.put({
+                    "id": request_id,
+                    "page": page_num,
+                    "products": None if products is None else [perfume_to_dict_obj(p) for p in products],
+                })
+            results.put({"id": request_id, "done": True})
+        except Exception as e:
+            results.put({"id": request_id, "error": f"{type(e).__name__}: {e}"})
+        finally:
+            try:
+                await parser.stop()
+            except Exception:
+                pass
+
+
+class CrawlerWorker:
+    def __init__(self, page_timeout: float = CRAWLER_PAGE_TIMEOUT_SECONDS, target=_worker_main):
+        self.page_timeout = page_timeout
+        self._target = target
+        self._process: Optional[mp.Process] = None
+        self._requests: Optional[mp.Queue] = None
+        self._results: Optional[mp.Queue] = None
+        self._cancelled = None
+        self._last_activity = 0.0
+        self._reader: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inboxes: dict[int, asyncio.Queue] = {}
+        self._ids = itertools.count(1)
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def alive(self):
+        return self._process is not None and self._process.is_alive()
+
+    def start(self):
+        if self.alive:
+            return
+        ctx = mp.get_context("spawn")
+        self._loop = asyncio.get_running_loop()
+        self._requests = ctx.Queue()
+        self._results = ctx.Queue()
+        self._cancelled = ctx.Value("q", 0, lock=False)
+        self._process = ctx.Process(target=self._target, args=(self._requests, self._results, self._cancelled),
+                                    name="perfumes-crawler", daemon=True)
+        self._process.start()
+        self._reader = threading.Thread(target=self._read_results, args=(self._results,), daemon=True)
+        self._reader.start()
+
+    async def stop(self, force: bool = False):
+        process, self._process = self._process, None
+        if process is None:
+            return
+        if not force:
+            try:
+                self._requests.put(None)
+            except Exception:
+                pass
+            await asyncio.to_thread(process.join, 10)
+        if process.is_alive():
+            process.kill()
+            await asyncio.to_thread(process.join)
+        self._results.put(None)
+        await asyncio.to_thread(self._reader.join, 5)
+
+    def _read_results(self, results: mp.Queue):
+        while True:
+            try:
+                msg = results.get()
+            except (EOFError, OSError):
+                return
+            if msg is None:
+                return
+            self._loop.call_soon_threadsafe(self._dispatch, msg)
+
+    def _dispatch(self, msg: dict):
+        self._last_activity = self._loop.time()
+        inbox = self._inboxes.get(msg.get("id"))
+        if inbox is not None:
+            inbox.put_nowait(msg)
+
+    async def fetch_pages(self, pages: List[int]):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            self.start()
+            request_id = next(self._ids)
+            inbox: asyncio.Queue = asyncio.Queue()
+            self._inboxes[request_id] = inbox
+            finished = False
+            try:
+                self._requests.put({"id": request_id, "pages": list(pages)})
+                self._last_activity = self._loop.time()
+                while True:
+                    try:
+                        msg = await asyncio.wait_for(inbox.get(), timeout=POLL_SECONDS)
+                    except asyncio.TimeoutError:
+                        if not self.alive:
+                            await self.stop(force=True)
+                            raise RuntimeError("Crawler worker exited unexpectedly")
+                        if self._loop.time() - self._last_activity >= self.page_timeout:
+                            await self.stop(force=True)
+                            raise RuntimeError("Crawler worker did not respond, restarting")
+                        continue
+                    if msg.get("error"):
+                        finished = True
+                        raise RuntimeError(f"Crawler worker failed: {msg['error']}")
+                    if msg.get("done"):
+                        finished = True
+                        return
+                    products = msg["products"]
+                    yield msg["page"], None if products is None else [Perfume(**p) for p in products]
+            finally:
+                if not finished and self._cancelled is not None:
+                    self._cancelled.value = request_id
+                self._inboxes.pop(request_id, None)
+
+
+crawler_worker = CrawlerWorker()
@@ -1,24 +1,60 @@
-from typing import Set
+from typing import Dict, List, Optional
 from fastapi import WebSocket
 
+from app.utils.serialization import dumps, msgpack_dumps, MSGPACK_AVAILABLE
+
 
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: Set[WebSocket] = set()
+        self.active_connections: Dict[WebSocket, str] = {}
+        self._replay_buffers: Dict[WebSocket, List[dict]] = {}
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.add(websocket)
+    async def connect(self, websocket: WebSocket, fmt: str = "json", subprotocol: Optional[str] = None,
+                      resume: bool = False):
+        await websocket.accept(subprotocol=subprotocol)
+        self.active_connections[websocket] = fmt if fmt == "msgpack" and MSGPACK_AVAILABLE else "json"
+        if resume:
+            self._replay_buffers[websocket] = []
 
     async def disconnect(self, websocket: WebSocket):
-        self.active_connections.discard(websocket)
+        self.active_connections.pop(websocket, None)
+        self._replay_buffers.pop(websocket, None)
+
+    async def send(self, websocket: WebSocket, message: dict):
+        if self.active_connections.get(websocket) == "msgpack":
+            await websocket.send_bytes(msgpack_dumps(message))
+        else:
+            await websocket.send_text(dumps(message).decode())
+
+    async def finish_replay(self, websocket: WebSocket, last_seq: int):
+        buffer = self._replay_buffers.get(websocket)
+        sent = set()
+        while buffer:
+            message = buffer.pop(0)
+            seq = message.get("seq")
+            if seq is not None:
+                if seq <= last_seq or seq in sent:
+                    continue
+                sent.add(seq)
+            await self.send(websocket, message)
+        self._replay_buffers.pop(websocket, None)
 
     async def broadcast(self, message: dict):
-        for ws in list(self.active_connections):
+        frames = {}
+        for ws, fmt in list(self.active_connections.items()):
+            buffer = self._replay_buffers.get(ws)
+            if buffer is not None:
+                buffer.append(message)
+                continue
+            if fmt not in frames:
+                frames[fmt] = msgpack_dumps(message) if fmt == "msgpack" else dumps(message).decode()
             try:
-                await ws.send_json(message)
+                if fmt == "msgpack":
+                    await ws.send_bytes(frames[fmt])
+                else:
+                    await ws.send_text(frames[fmt])
             except Exception:
                 await self.disconnect(ws)
 
 
-manager = ConnectionManager()
\ No newline at end of file
+manager = ConnectionManager()
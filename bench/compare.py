@@ -0,0 +1,115 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+HIGHER_IS_BETTER = ("throughput_rps", "ingest_rate_msg_s", "deliveries_per_s", "pages_per_s")
+LOWER_IS_BETTER = ("_ms", "_ms_per_page")
+FAILURE_COUNTS = ("errors", "missed_deliveries")
+
+
+def flatten(node, prefix: str = ""):
+    out = {}
+    if isinstance(node, dict):
+        for k, v in node.items():
+            out.update(flatten(v, f"{prefix}.{k}" if prefix else k))
+    elif isinstance(node, (int, float)) and not isinstance(node, bool):
+        out[prefix] = float(node)
+    return out
+
+
+def find_errors(node, prefix: str = ""):
+    out = {}
+    if isinstance(node, dict):
+        for k, v in node.items():
+            path = f"{prefix}.{k}" if prefix else k
+            if k == "error" and isinstance(v, str):
+                out[path] = v
+            else:
+                out.update(find_errors(v, path))
+    return out
+
+
+def direction(metric: str):
+    name = metric.rsplit(".", 1)[-1]
+    if name in HIGHER_IS_BETTER:
+        return 1
+    if name in FAILURE_COUNTS or name.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def compare(baseline: dict, current: dict, threshold: float):
+    base = flatten(baseline.get("results", {}))
+    cur = flatten(current.get("results", {}))
+    rows = []
+    for metric, error in sorted(find_errors(current.get("results", {})).items()):
+        rows.append({"metric": metric, "baseline": None, "current": None, "change_pct": None,
+                     "error": error, "regression": True})
+    for metric in sorted(base.keys()):
+        sign = direction(metric)
+        if sign == 0:
+            continue
+        if metric not in cur:
+            rows.append({"metric": metric, "baseline": base[metric], "current": None, "change_pct": None,
+                         "missing": True, "regression": True})
+            continue
+        if base[metric] == 0:
+            if cur[metric] == 0:
+                continue
+            change = float("inf")
+        else:
+            change = (cur[metric] - base[metric]) / base[metric]
+        rows.append({
+            "metric": metric,
+            "baseline": base[metric],
+            "current": cur[metric],
+            "change_pct": round(change * 100, 2) if change != float("inf") else None,
+            "regression": change * sign < -threshold,
+        })
+    return rows
+
+
+def _pct(row):
+    if row.get("error"):
+        return "error"
+    if row.get("missing"):
+        return "missing"
+    return "new" if row["change_pct"] is None else f"{row['change_pct']:+.2f}%"
+
+
+def _num(value):
+    return "-" if value is None else f"{value:.3f}"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare two benchmark result files")
+    ap.add_argument("baseline")
+    ap.add_argument("current")
+    ap.add_argument("--threshold", type=float, default=0.10, help="Relative change treated as regression")
+    ap.add_argument("--json", action="store_true", help="Print machine-readable comparison")
+    args = ap.parse_args()
+
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    current = json.loads(Path(args.current).read_text(encoding="utf-8"))
+    rows = compare(baseline, current, args.threshold)
+
+    if args.json:
+        print(json.dumps({
+            "baseline_commit": baseline.get("meta", {}).get("commit"),
+            "current_commit": current.get("meta", {}).get("commit"),
+            "threshold": args.threshold,
+            "metrics": rows,
+        }, indent=2))
+    else:
+        for r in rows:
+            flag = "REGRESSION" if r["regression"] else ""
+            print(f"{r['metric']:<55} {_num(r['baseline']):>12} {_num(r['current']):>12} {_pct(r):>9} {flag}"
+                  + (f" {r['error']}" if r.get("error") else ""))
+
+    sys.exit(1 if any(r["regression"] for r in rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import argparse
+import random
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+PAGE_RE = re.compile(r"/page-(\d+)/?$")
+
+BRANDS = ["Chanel", "Dior", "Hugo Boss", "Lacoste", "Armani", "Versace", "Gucci", "Montale"]
+
+
+class FixtureCatalog:
+    def __init__(self, pages: int = 100, per_page: int = 24, volatile_ratio: float = 0.1, seed: int = 42):
+        self.pages = pages
+        self.per_page = per_page
+        self.volatile_ratio = volatile_ratio
+        self.seed = seed
+        self.hits: dict[int, int] = {}
+        self._lock = threading.Lock()
+        rnd = random.Random(seed)
+        self.volatile_pages = {p for p in range(1, pages + 1) if rnd.random() < volatile_ratio}
+
+    def _visit(self, page: int):
+        with self._lock:
+            self.hits[page] = self.hits.get(page, 0) + 1
+            return self.hits[page]
+
+    def render_page(self, page: int) -> Optional[str]:
+        if page < 1 or page > self.pages:
+            return None
+        visit = self._visit(page)
+        rnd = random.Random(self.seed * 100_003 + page)
+        tiles = []
+        for i in range(self.per_page):
+            product_id = (page - 1) * self.per_page + i + 1
+            brand = BRANDS[product_id % len(BRANDS)]
+            price = rnd.randint(1500, 25000)
+            if page in self.volatile_pages:
+                price += visit * 10
+            discounted = product_id % 3 == 0
+            old_price = f'<span class="product-tile-price__text--old">{price + 1000}&nbsp;₽</span>' if discounted else ""
+            tiles.append(
+                f'<a href="/product/bench-{page}-{i}/{product_id}">'
+                f'<div class="product-tile-name__text">'
+                f'<span class="product-tile-name__text--brand">{brand}</span>'
+                f"<span> </span>"
+                f"<span>Bench perfume {product_id}</span>"
+                f"</div>"
+                f'<span class="product-tile-price__text--actual">{price}&nbsp;₽</span>'
+                f"{old_price}"
+                f"</a>"
+            )
+        return "<html><body><main>" + "".join(tiles) + "</main></body></html>"
+
+
+def make_handler(catalog: FixtureCatalog):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            m = PAGE_RE.search(self.path.split("?", 1)[0])
+            body = catalog.render_page(int(m.group(1))) if m else None
+            if body is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            payload = body.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class FixtureServer:
+    def __init__(self, catalog: FixtureCatalog, host: str = "127.0.0.1", port: int = 0):
+        self.catalog = catalog
+        self._httpd = ThreadingHTTPServer((host, port), make_handler(catalog))
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/browse/muzhchinam/muzhskaya-parfyumeriya"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Local letu.ru listing fixture")
+    ap.add_argument("--port", type=int, default=8900)
+    ap.add_argument("--pages", type=int, default=100)
+    ap.add_argument("--per-page", type=int, default=24)
+    ap.add_argument("--volatile-ratio", type=float, default=0.1)
+    args = ap.parse_args()
+
+    server = FixtureServer(FixtureCatalog(args.pages, args.per_page, args.volatile_ratio), port=args.port)
+    print("BASE_URL =", server.base_url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+import asyncio
+import json
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+
+import httpx
+import websockets
+
+
+def percentile(values: list[float], q: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def summarize(latencies: list[float], elapsed: float, errors: int = 0, count: Optional[int] = None):
+    count = len(latencies) if count is None else count
+    return {
+        "requests": count,
+        "ok": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed > 0 else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+    }
+
+
+def bench_perfume(tag: str, i: int):
+    return {
+        "title": f"Bench perfume {tag}-{i}",
+        "brand": "Bench",
+        "actual_price": f"{1000 + i} ₽",
+        "old_price": "",
+        "url": f"https://bench.local/product/{tag}/{i}",
+    }
+
+
+async def _drive(n: int, concurrency: int, op: Callable[[int], Awaitable[bool]]):
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(n))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            t0 = time.perf_counter()
+            try:
+                ok = await op(i)
+            except Exception:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - t0)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started, errors, count=n)
+
+
+async def _drive_until(stop: asyncio.Event, concurrency: int, op: Callable[[int], Awaitable[bool]]):
+    latencies: list[float] = []
+    errors = 0
+    sent = 0
+
+    async def worker():
+        nonlocal errors, sent
+        while not stop.is_set():
+            i, sent = sent, sent + 1
+            t0 = time.perf_counter()
+            try:
+                ok = await op(i)
+            except Exception:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - t0)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started, errors, count=sent)
+
+
+async def rest_load(api_url: str, requests: int = 1000, concurrency: int = 32, seed_items: int = 500):
+    tag = uuid.uuid4().hex[:8]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=api_url, limits=limits, timeout=30) as client:
+        created_ids: list[int] = []
+
+        async def create(i: int):
+            r = await client.post("/perfumes", json=bench_perfume(tag, i))
+            if r.status_code == 201:
+                created_ids.append(r.json()["id"])
+                return True
+            return False
+
+        results = {"create_perfume": await _drive(max(requests, seed_items), concurrency, create)}
+
+        async def list_all(i: int):
+            return (await client.get("/perfumes")).status_code == 200
+
+        async def get_one(i: int):
+            return (await client.get(f"/perfumes/{created_ids[i % len(created_ids)]}")).status_code == 200
+
+        async def patch_one(i: int):
+            r = await client.patch(f"/perfumes/{created_ids[i % len(created_ids)]}",
+                                   json={"actual_price": f"{2000 + i} ₽"})
+            return r.status_code == 200
+
+        async def list_brands(i: int):
+            return (await client.get("/brands")).status_code == 200
+
+        results["list_perfumes"] = await _drive(max(1, requests // 10), concurrency, list_all)
+        results["get_perfume"] = await _drive(requests, concurrency, get_one)
+        results["patch_perfume"] = await _drive(requests, concurrency, patch_one)
+        results["list_brands"] = await _drive(requests, concurrency, list_brands)
+
+        to_delete = list(created_ids)
+
+        async def delete_one(i: int):
+            return (await client.delete(f"/perfumes/{to_delete[i]}")).status_code == 200
+
+        results["delete_perfume"] = await _drive(len(to_delete), concurrency, delete_one)
+        results["list_perfumes"]["catalog_size"] = len(created_ids)
+    return results
+
+
+async def api_under_crawl(api_url: str, requests: int = 500, concurrency: int = 16, mode: str = "sweep",
+                          timeout: float = 600.0):
+    limits = httpx.Limits(max_connections=concurrency + 1, max_keepalive_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=api_url, limits=limits, timeout=30) as client:
+        seeded = []
+        for i in range(concurrency):
+            r = await client.post("/perfumes", json=bench_perfume(f"crawl-{uuid.uuid4().hex[:8]}", i))
+            if r.status_code == 201:
+                seeded.append(r.json()["id"])
+
+        async def read(i: int):
+            if i % 2 and seeded:
+                return (await client.get(f"/perfumes/{seeded[i % len(seeded)]}")).status_code == 200
+            return (await client.get("/brands")).status_code == 200
+
+        results = {"idle": await _drive(requests, concurrency, read)}
+
+        r = await client.post("/tasks/run", params={"mode": mode})
+        r.raise_for_status()
+        job = r.json()["job"]
+        crawl_done = asyncio.Event()
+        crawl_started = time.perf_counter()
+
+        async def watch():
+            nonlocal job
+            deadline = time.monotonic() + timeout
+            try:
+                while job["status"] in ("pending", "running") and time.monotonic() < deadline:
+                    await asyncio.sleep(0.2)
+                    job = (await client.get(f"/tasks/{job['id']}")).json()
+            finally:
+                crawl_done.set()
+
+        _, results["crawling"] = await asyncio.gather(watch(), _drive_until(crawl_done, concurrency, read))
+        results["crawl_elapsed_s"] = round(time.perf_counter() - crawl_started, 4)
+        results["pages_crawled"] = job["pages_done"]
+        if job["status"] != "done":
+            reason = (job.get("error") or job.get("detail") or "timed out").splitlines()[0]
+            results["error"] = f"crawl job {job['status']}: {reason}"
+
+        for perfume_id in seeded:
+            await client.delete(f"/perfumes/{perfume_id}")
+    return results
+
+
+async def ws_fanout(api_url: str, ws_url: str, clients: int, events: int = 5, connect_concurrency: int = 200,
+                    timeout: float = 60.0):
+    sem = asyncio.Semaphore(connect_concurrency)
+
+    async def open_one():
+        async with sem:
+            return await websockets.connect(ws_url, max_queue=None, open_timeout=30, ping_interval=None)
+
+    t0 = time.perf_counter()
+    opened = await asyncio.gather(*(open_one() for _ in range(clients)), return_exceptions=True)
+    sockets = [s for s in opened if not isinstance(s, BaseException)]
+    connect_elapsed = time.perf_counter() - t0
+
+    tag = uuid.uuid4().hex[:8]
+    latencies: list[float] = []
+    completion: list[float] = []
+    missed = 0
+
+    async def reader(ws, expected: set[str], arrivals: dict[str, float]):
+        try:
+            while expected - arrivals.keys():
+                raw = await ws.recv()
+                now = time.perf_counter()
+                msg = json.loads(raw) if isinstance(raw, str) else None
+                if not msg or msg.get("event") != "perfume_created":
+                    continue
+                url = (msg.get("perfume") or {}).get("url")
+                if url in expected and url not in arrivals:
+                    arrivals[url] = now
+        except Exception:
+            pass
+
+    async with httpx.AsyncClient(base_url=api_url, timeout=timeout) as client:
+        for i in range(events):
+            body = bench_perfume(f"ws-{tag}", i)
+            expected = {body["url"]}
+            per_client: list[dict[str, float]] = [{} for _ in sockets]
+            readers = [asyncio.create_task(reader(ws, expected, arr)) for ws, arr in zip(sockets, per_client)]
+            sent = time.perf_counter()
+            r = await client.post("/perfumes", json=body)
+            _, pending = await asyncio.wait(readers, timeout=timeout)
+            for t in pending:
+                t.cancel()
+            arrivals = [arr[body["url"]] - sent for arr in per_client if body["url"] in arr]
+            missed += len(sockets) - len(arrivals)
+            latencies.extend(arrivals)
+            if arrivals:
+                completion.append(max(arrivals))
+            if r.status_code == 201:
+                await client.delete(f"/perfumes/{r.json()['id']}")
+
+    await asyncio.gather(*(ws.close() for ws in sockets), return_exceptions=True)
+
+    return {
+        "clients_requested": clients,
+        "clients_connected": len(sockets),
+        "connect_elapsed_s": round(connect_elapsed, 4),
+        "events": events,
+        "deliveries": len(latencies),
+        "missed_deliveries": missed,
+        "delivery_p50_ms": round(percentile(latencies, 0.50) * 1000, 3) if latencies else None,
+        "delivery_p99_ms": round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+        "fanout_complete_p50_ms": round(percentile(completion, 0.50) * 1000, 3) if completion else None,
+        "deliveries_per_s": round(len(latencies) / sum(completion), 2) if completion and sum(completion) > 0 else None,
+    }
+
+
+async def nats_ingest(servers: list[str], subject: str, messages: int = 2000, timeout: float = 120.0):
+    from nats.aio.client import Client as NATS
+
+    tag = uuid.uuid4().hex[:8]
+    prefix = f"https://bench.local/product/nats-{tag}/"
+    applied: dict[str, float] = {}
+    sent_at: dict[str, float] = {}
+    all_applied = asyncio.Event()
+
+    async def on_msg(msg):
+        try:
+            data = json.loads(msg.data.decode())
+        except Exception:
+            return
+        if data.get("source") != "nats_server":
+            return
+        url = (data.get("perfume") or {}).get("url") or ""
+        if url.startswith(prefix) and url not in applied:
+            applied[url] = time.perf_counter()
+            if len(applied) >= messages:
+                all_applied.set()
+
+    nc = NATS()
+    await nc.connect(servers=servers)
+    await nc.subscribe(subject, cb=on_msg)
+
+    started = time.perf_counter()
+    for i in range(messages):
+        body = bench_perfume(f"nats-{tag}", i)
+        sent_at[body["url"]] = time.perf_counter()
+        await nc.publish(subject, json.dumps({"event": "perfume_created", "perfume": body,
+                                              "source": "bench"}).encode())
+    await nc.flush()
+    publish_elapsed = time.perf_counter() - started
+
+    try:
+        await asyncio.wait_for(all_applied.wait(), timeout=timeout)
+    except asyncio.TimeoutError:
+        pass
+    elapsed = (max(applied.values()) - started) if applied else time.perf_counter() - started
+    await nc.drain()
+
+    latencies = [applied[u] - sent_at[u] for u in applied]
+    return {
+        "messages": messages,
+        "applied": len(applied),
+        "publish_elapsed_s": round(publish_elapsed, 4),
+        "elapsed_s": round(elapsed, 4),
+        "ingest_rate_msg_s": round(len(applied) / elapsed, 2) if elapsed > 0 else None,
+        "apply_p50_ms": round(percentile(latencies, 0.50) * 1000, 3) if latencies else None,
+        "apply_p99_ms": round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+    }
+
+
+async def crawl_pages(base_url: str, pages: int = 10):
+    from app.services.parser import LetuParser
+
+    parser = LetuParser()
+    parser.base_url = base_url
+    await parser.start()
+    latencies: list[float] = []
+    products = 0
+    errors = 0
+    base = base_url.rstrip("/")
+    try:
+        for page_num in range(1, pages + 1):
+            t0 = time.perf_counter()
+            try:
+                await parser.load_page(f"{base}/page-{page_num}")
+                products += len(await parser.parse_products_from_page())
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - t0)
+    finally:
+        await parser.stop()
+
+    total = sum(latencies)
+    return {
+        "pages": pages,
+        "errors": errors,
+        "products": products,
+        "mean_ms_per_page": round(total / len(latencies) * 1000, 3) if latencies else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+        "pages_per_s": round(len(latencies) / total, 3) if total > 0 else None,
+    }
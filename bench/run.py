@@ -0,0 +1,228 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from bench.fixture_server import FixtureCatalog, FixtureServer
+from bench import loadgen
+
+
+ROOT = Path(__file__).resolve().parent.parent
+NATS_SUBJECT = "perfumes.updates"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def raise_fd_limit(wanted: int):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = min(max(soft, wanted), hard)
+    if target > soft:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+    return target
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return None
+
+
+def find_nats_server(explicit: Optional[str]):
+    for candidate in (explicit, str(ROOT / "nats-server"), shutil.which("nats-server")):
+        if candidate and os.path.isfile(candidate) and os.access(candidate, os.X_OK):
+            return candidate
+    return None
+
+
+def wait_for_port(port: int, timeout: float = 15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+def start_nats(binary: str):
+    port = free_port()
+    proc = subprocess.Popen([binary, "-a", "127.0.0.1", "-p", str(port)],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if not wait_for_port(port):
+        proc.terminate()
+        raise RuntimeError("nats-server did not start")
+    return proc, f"nats://127.0.0.1:{port}"
+
+
+def start_api(env: dict[str, str]):
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--ws-max-queue", "1024"],
+        cwd=ROOT, env={**os.environ, **env},
+    )
+    api_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{api_url}/brands", timeout=1).status_code == 200:
+                return proc, api_url
+        except httpx.HTTPError:
+            pass
+        if proc.poll() is not None:
+            break
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("API did not start")
+
+
+def stop(proc: Optional[subprocess.Popen]):
+    if proc is None or proc.poll() is not None:
+        return
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+async def run_scenario(name: str, coro, results: dict):
+    print(f"[bench] {name}...", file=sys.stderr)
+    try:
+        results[name] = await coro
+    except Exception as e:
+        results[name] = {"error": f"{type(e).__name__}: {e}"}
+
+
+async def run_all(args, api_url: str, nats_url: Optional[str], fixture: FixtureServer):
+    results: dict = {}
+    if "rest" in args.scenarios:
+        await run_scenario("rest", loadgen.rest_load(api_url, args.rest_requests, args.rest_concurrency), results)
+    if "ws" in args.scenarios:
+        ws_url = api_url.replace("http://", "ws://") + "/ws/perfumes"
+        fanout: dict = {}
+        for clients in args.ws_clients:
+            await run_scenario(str(clients), loadgen.ws_fanout(api_url, ws_url, clients, args.ws_events), fanout)
+        results["ws_fanout"] = fanout
+    if "nats" in args.scenarios:
+        if nats_url:
+            await run_scenario("nats_ingest", loadgen.nats_ingest([nats_url], NATS_SUBJECT, args.nats_messages),
+                               results)
+        else:
+            results["nats_ingest"] = {"skipped": "nats-server binary not found"}
+    if "crawl" in args.scenarios:
+        await run_scenario("crawl", loadgen.crawl_pages(fixture.base_url, args.crawl_pages), results)
+    return results
+
+
+def run_crawl_load(args, env: dict[str, str], workdir: str):
+    results: dict = {}
+    for name, process in (("inline", False), ("worker", True)):
+        api_proc = None
+        try:
+            api_proc, api_url = start_api({
+                **env,
+                "DATABASE_URL": f"sqlite+aiosqlite:///{workdir}/crawl-{name}.db",
+                "CRAWLER_PROCESS": "true" if process else "false",
+                "CRAWL_BUDGET_PAGES": str(args.crawl_pages),
+            })
+            asyncio.run(run_scenario(f"crawl_load/{name}", loadgen.api_under_crawl(
+                api_url, args.crawl_load_requests, args.rest_concurrency), results))
+            results[name] = results.pop(f"crawl_load/{name}")
+        except Exception as e:
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+        finally:
+            stop(api_proc)
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Offline benchmark for the Perfumes API")
+    ap.add_argument("--output", "-o", default=None, help="Write JSON results to this file (default: stdout)")
+    ap.add_argument("--scenarios", nargs="+", default=["rest", "ws", "nats", "crawl", "crawl_load"],
+                    choices=["rest", "ws", "nats", "crawl", "crawl_load"])
+    ap.add_argument("--rest-requests", type=int, default=1000)
+    ap.add_argument("--rest-concurrency", type=int, default=32)
+    ap.add_argument("--ws-clients", type=int, nargs="+", default=[1000, 10000])
+    ap.add_argument("--ws-events", type=int, default=5)
+    ap.add_argument("--nats-messages", type=int, default=2000)
+    ap.add_argument("--nats-server", default=None, help="Path to nats-server binary")
+    ap.add_argument("--crawl-pages", type=int, default=10)
+    ap.add_argument("--crawl-load-requests", type=int, default=500, help="Idle API requests before a crawl_load run")
+    ap.add_argument("--fixture-pages", type=int, default=100)
+    ap.add_argument("--fixture-per-page", type=int, default=24)
+    args = ap.parse_args()
+
+    fd_limit = raise_fd_limit(max(args.ws_clients, default=0) * 2 + 1024)
+
+    fixture = FixtureServer(FixtureCatalog(args.fixture_pages, args.fixture_per_page)).start()
+    nats_proc = api_proc = None
+    nats_url = None
+    workdir = tempfile.mkdtemp(prefix="perfumes-bench-")
+    try:
+        binary = find_nats_server(args.nats_server)
+        if binary:
+            nats_proc, nats_url = start_nats(binary)
+
+        env = {
+            "DATABASE_URL": f"sqlite+aiosqlite:///{workdir}/bench.db",
+            "BASE_URL": fixture.base_url,
+            "MAX_PAGES": str(args.fixture_pages),
+            "BACKGROUND_ENABLED": "false",
+            "NATS_SERVERS": nats_url or "nats://127.0.0.1:1",
+            "NATS_SUBJECT": NATS_SUBJECT,
+        }
+        api_proc, api_url = start_api(env)
+
+        started = time.perf_counter()
+        results = asyncio.run(run_all(args, api_url, nats_url, fixture))
+        stop(api_proc)
+        if "crawl_load" in args.scenarios:
+            results["crawl_load"] = run_crawl_load(args, env, workdir)
+        report = {
+            "meta": {
+                "commit": git_commit(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "fd_limit": fd_limit,
+                "duration_s": round(time.perf_counter() - started, 3),
+                "params": {k: v for k, v in vars(args).items() if k != "output"},
+            },
+            "results": results,
+        }
+    finally:
+        stop(api_proc)
+        stop(nats_proc)
+        fixture.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    out = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(out + "\n", encoding="utf-8")
+    else:
+        print(out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+_db_dir = tempfile.mkdtemp(prefix="perfumes-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_dir}/test.db"
+os.environ["MAX_PAGES"] = "10"
+os.environ["CRAWL_BUDGET_PAGES"] = "3"
+os.environ["BACKGROUND_ENABLED"] = "false"
+
+from sqlmodel import SQLModel  # noqa: E402
+
+from app.db.base import engine  # noqa: E402
+
+
+async def _reset_db():
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.drop_all)
+        await conn.run_sync(SQLModel.metadata.create_all)
+    await engine.dispose()
+
+
+@pytest.fixture
+def run():
+    asyncio.run(_reset_db())
+
+    def _run(coro):
+        async def main():
+            try:
+                return await coro
+            finally:
+                await engine.dispose()
+        return asyncio.run(main())
+    return _run
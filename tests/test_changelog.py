@@ -0,0 +1,103 @@
+import orjson
+
+import app.main
+from app.db.base import async_session
+from app.main import replay_changes
+from app.services.changelog import changes_since, compact_changes, entry_to_event, log_change
+from app.ws.manager import ConnectionManager
+
+
+class FakeWebSocket:
+    def __init__(self, on_first_send=None):
+        self.received = []
+        self._on_first_send = on_first_send
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, data: str):
+        self.received.append(orjson.loads(data))
+        if self._on_first_send:
+            hook, self._on_first_send = self._on_first_send, None
+            await hook()
+
+    async def send_bytes(self, data: bytes):
+        raise AssertionError("unexpected binary frame")
+
+
+async def add_changes(session, *titles, created_at=None):
+    entries = [log_change(session, "created", {"id": i, "title": t}, "api") for i, t in enumerate(titles, 1)]
+    if created_at is not None:
+        for entry in entries:
+            entry.created_at = created_at
+    await session.commit()
+    return entries
+
+
+def test_broadcasts_during_replay_are_delivered_once_in_order(run, monkeypatch):
+    manager = ConnectionManager()
+    monkeypatch.setattr(app.main, "manager", manager)
+
+    async def scenario():
+        async with async_session() as session:
+            entries = await add_changes(session, "a", "b", "c")
+
+        live = FakeWebSocket()
+        await manager.connect(live)
+
+        async def concurrent_writes():
+            async with async_session() as session:
+                new = await add_changes(session, "d")
+            await manager.broadcast(entry_to_event(entries[2]))
+            await manager.broadcast(entry_to_event(new[0]))
+
+        resuming = FakeWebSocket(on_first_send=concurrent_writes)
+        await manager.connect(resuming, resume=True)
+        await replay_changes(resuming, since=entries[0].seq)
+
+        seqs = [(m["event"], m.get("seq", m.get("last_seq"))) for m in resuming.received]
+        assert seqs == [("created", 2), ("created", 3), ("replay_complete", 3), ("created", 4)]
+        assert [m["seq"] for m in live.received] == [3, 4]
+
+        await manager.broadcast({"seq": 5, "event": "updated"})
+        assert resuming.received[-1]["seq"] == 5
+    run(scenario())
+
+
+def test_out_of_order_broadcasts_during_replay_are_not_dropped(run):
+    manager = ConnectionManager()
+
+    async def scenario():
+        ws = FakeWebSocket()
+        await manager.connect(ws, resume=True)
+        await manager.broadcast({"seq": 11, "event": "updated"})
+        await manager.broadcast({"seq": 10, "event": "updated"})
+        await manager.broadcast({"seq": 11, "event": "updated"})
+        await manager.broadcast({"seq": 9, "event": "updated"})
+        await manager.finish_replay(ws, 9)
+        assert [m["seq"] for m in ws.received] == [11, 10]
+    run(scenario())
+
+
+def test_since_before_compaction_returns_reset(run, monkeypatch):
+    manager = ConnectionManager()
+    monkeypatch.setattr(app.main, "manager", manager)
+
+    async def scenario():
+        async with async_session() as session:
+            await add_changes(session, "a", "b", created_at=100.0)
+            await add_changes(session, "c")
+            assert await compact_changes(session, retention_seconds=60, now=1000.0) == 2
+
+            page = await changes_since(session, 0)
+            assert page == {"events": [], "last_seq": 3, "has_more": False, "reset": True}
+            page = await changes_since(session, 2)
+            assert [e["seq"] for e in page["events"]] == [3]
+            assert not page["reset"]
+
+        ws = FakeWebSocket()
+        await manager.connect(ws, resume=True)
+        await replay_changes(ws, since=1)
+        assert ws.received == [{"event": "resync_required", "last_seq": 3},
+                               {"event": "replay_complete", "last_seq": 3}]
+    run(scenario())
@@ -0,0 +1,88 @@
+import asyncio
+import contextlib
+import os
+import time
+
+import pytest
+
+import app.workers.crawler as crawler
+from app.workers.crawler import CrawlerWorker
+
+
+PAGE_SECONDS = 0.6
+
+
+def echo_worker(requests, results, cancelled):
+    crawled = 0
+    while True:
+        request = requests.get()
+        if request is None:
+            break
+        if cancelled.value == request["id"]:
+            continue
+        for page in request["pages"]:
+            if cancelled.value == request["id"]:
+                break
+            if page == 0:
+                os._exit(1)
+            if page < 0:
+                time.sleep(3600)
+            time.sleep(PAGE_SECONDS)
+            crawled += 1
+            results.put({"id": request["id"], "page": page, "products": [{"title": str(crawled)}]})
+        results.put({"id": request["id"], "done": True})
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    monkeypatch.setattr(crawler, "POLL_SECONDS", 0.1)
+    return CrawlerWorker(page_timeout=1.0, target=echo_worker)
+
+
+async def collect(worker, pages):
+    return [(page, int(products[0].title)) async for page, products in worker.fetch_pages(pages)]
+
+
+async def warm_up(worker):
+    page_timeout, worker.page_timeout = worker.page_timeout, 30
+    try:
+        assert await collect(worker, [1]) == [(1, 1)]
+    finally:
+        worker.page_timeout = page_timeout
+
+
+def test_abandoned_request_is_cancelled_and_counts_as_heartbeat(worker):
+    async def scenario():
+        try:
+            await warm_up(worker)
+            async with contextlib.aclosing(worker.fetch_pages(list(range(1, 30)))) as pages:
+                async for page, _ in pages:
+                    assert page == 1
+                    break
+            # The child finishes its in-flight page before picking up the next request. That makes the
+            # first reply take longer than page_timeout, so the old request's output must count as activity.
+            assert await collect(worker, [100]) == [(100, 4)]
+        finally:
+            await worker.stop()
+    asyncio.run(scenario())
+
+
+def test_unresponsive_worker_is_killed(worker):
+    async def scenario():
+        await warm_up(worker)
+        with pytest.raises(RuntimeError, match="did not respond"):
+            await collect(worker, [-1])
+        assert not worker.alive
+    asyncio.run(scenario())
+
+
+def test_worker_restarts_after_child_dies(worker):
+    async def scenario():
+        worker.page_timeout = 30
+        try:
+            with pytest.raises(RuntimeError, match="exited unexpectedly"):
+                await collect(worker, [0])
+            assert await collect(worker, [1, 2]) == [(1, 1), (2, 2)]
+        finally:
+            await worker.stop()
+    asyncio.run(scenario())
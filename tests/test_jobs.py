@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+import app.tasks.jobs as jobs
+from app.services.scheduler import CrawlSkipped
+from app.tasks.jobs import JobManager
+
+
+@pytest.fixture(autouse=True)
+def fresh_lock(monkeypatch):
+    monkeypatch.setattr(jobs, "parse_lock", asyncio.Lock())
+
+
+def test_duplicate_submit_returns_same_job(run, monkeypatch):
+    release = asyncio.Event()
+    calls = []
+
+    async def fake_run(session, mode, progress=None):
+        calls.append(mode)
+        progress(2, 0, 0)
+        await release.wait()
+        progress(2, 2, 5)
+        return 5
+
+    monkeypatch.setattr(jobs, "run_perfumes_generator_once", fake_run)
+
+    async def scenario():
+        manager = JobManager()
+        first, created = manager.submit("incremental")
+        second, created_again = manager.submit("incremental")
+        assert created and not created_again
+        assert second is first
+        assert first.triggers == 2
+
+        await first.wait_planned(1)
+        other, other_created = manager.submit("sweep")
+        assert other_created and other is not first
+        await asyncio.sleep(0.05)
+        assert (first.status, other.status) == ("running", "pending")
+        assert other.started_at is None
+
+        release.set()
+        await first.wait()
+        await other.wait()
+        assert first.to_dict()["status"] == "done"
+        assert (first.pages_total, first.pages_done, first.items_changed) == (2, 2, 5)
+        assert calls == ["incremental", "sweep"]
+        assert manager.submit("incremental")[1]
+        await manager.shutdown()
+    run(scenario())
+
+
+def test_cancel_running_job(run, monkeypatch):
+    async def fake_run(session, mode, progress=None):
+        progress(1, 0, 0)
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(jobs, "run_perfumes_generator_once", fake_run)
+
+    async def scenario():
+        manager = JobManager()
+        job, _ = manager.submit("incremental")
+        await job.wait_planned(1)
+        assert job.status == "running"
+        assert manager.cancel(job.id) is job
+        await asyncio.wait({job.task}, timeout=1)
+        assert job.status == "cancelled"
+        assert job.finished_at is not None
+        assert manager.cancel("missing") is None
+    run(scenario())
+
+
+def test_job_without_pages_is_skipped(run, monkeypatch):
+    async def fake_run(session, mode, progress=None):
+        raise CrawlSkipped("crawl budget exhausted")
+
+    monkeypatch.setattr(jobs, "run_perfumes_generator_once", fake_run)
+
+    async def scenario():
+        manager = JobManager()
+        job, _ = manager.submit("incremental")
+        await job.wait_planned(1)
+        assert job.status == "skipped"
+        assert job.to_dict()["detail"] == "crawl budget exhausted"
+        assert job.error is None
+    run(scenario())
@@ -0,0 +1,71 @@
+import pytest
+
+from app.db.base import async_session
+from app.models.models import PageSchedule, Perfume
+from app.services.scheduler import (CHANGE_RATE_ALPHA, CrawlSkipped, advance_sweep, budget_remaining,
+                                    interval_for_rate, record_visit, select_pages)
+from app.config import CRAWL_BUDGET_PAGES, CRAWL_MIN_INTERVAL_SECONDS, CRAWL_MAX_INTERVAL_SECONDS
+
+
+def perfumes(price: str):
+    return [Perfume(title="Sauvage", brand="Dior", url="/p/1", actual_price=price)]
+
+
+def test_interval_for_rate_is_clamped_and_decreasing():
+    assert interval_for_rate(1.0) == CRAWL_MIN_INTERVAL_SECONDS
+    assert interval_for_rate(0.0) == CRAWL_MAX_INTERVAL_SECONDS
+    assert interval_for_rate(1e-9) == CRAWL_MAX_INTERVAL_SECONDS
+    assert interval_for_rate(0.5) == 2 * CRAWL_MIN_INTERVAL_SECONDS
+    assert interval_for_rate(0.2) > interval_for_rate(0.4) > interval_for_rate(0.8)
+
+
+def test_record_visit_updates_change_rate_and_interval(run):
+    async def scenario():
+        async with async_session() as session:
+            assert await record_visit(session, 1, perfumes("100"), now=1000.0) is False
+            state = await session.get(PageSchedule, 1)
+            rate = state.change_rate
+
+            assert await record_visit(session, 1, perfumes("100"), now=2000.0) is False
+            await session.refresh(state)
+            assert state.change_rate == pytest.approx((1 - CHANGE_RATE_ALPHA) * rate)
+            quiet_interval = state.interval_seconds
+            assert quiet_interval == interval_for_rate(state.change_rate)
+            assert state.next_visit_at == 2000.0 + quiet_interval
+
+            rate = state.change_rate
+            assert await record_visit(session, 1, perfumes("90"), now=3000.0) is True
+            await session.refresh(state)
+            assert state.change_rate == pytest.approx(CHANGE_RATE_ALPHA + (1 - CHANGE_RATE_ALPHA) * rate)
+            assert state.interval_seconds < quiet_interval
+            assert (state.visits, state.changes) == (3, 1)
+    run(scenario())
+
+
+def test_budget_counts_visits_not_pages(run):
+    async def scenario():
+        async with async_session() as session:
+            for _ in range(CRAWL_BUDGET_PAGES):
+                await record_visit(session, 1, perfumes("100"))
+            assert await budget_remaining(session) == 0
+            with pytest.raises(CrawlSkipped, match="budget"):
+                await select_pages(session, "incremental")
+            with pytest.raises(CrawlSkipped, match="budget"):
+                await select_pages(session, "sweep")
+    run(scenario())
+
+
+def test_sweep_cursor_moves_only_for_visited_pages(run):
+    async def scenario():
+        async with async_session() as session:
+            assert await select_pages(session, "sweep") == [1, 2, 3]
+            assert await select_pages(session, "sweep") == [1, 2, 3]
+
+            await advance_sweep(session, 1)
+            await record_visit(session, 1, perfumes("100"))
+            assert await select_pages(session, "sweep") == [2, 3]
+
+            await advance_sweep(session, 10)
+            await session.commit()
+            assert await select_pages(session, "sweep", limit=1) == [1]
+    run(scenario())